@@ -2,37 +2,136 @@
 # coding: utf-8
 
 
-import scholarly
+import argparse
 import datetime
 import math
 import logging
 import time
 import os
 import re
-from difflib import SequenceMatcher
-from fpdf import FPDF
-from fpdf.enums import XPos, YPos, Align
+import hashlib
+import importlib.util
+import pickle
+import random
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from heapq import nlargest
+from operator import attrgetter
+from collections import Counter, namedtuple
+
+class MaxTriesExceededException(Exception):
+    pass
+
+class CacheMissError(Exception):
+    pass
+
+scholarly_api = None
+scholarly_import_lock = threading.Lock()
+
+def load_scholarly():
+    global scholarly_api, MaxTriesExceededException
+    if scholarly_api is None:
+        with scholarly_import_lock:
+            if scholarly_api is None:
+                import scholarly
+                try:
+                    from scholarly._navigator import MaxTriesExceededException as max_tries_exception
+                except ImportError:
+                    try:
+                        from scholarly._proxy_generator import MaxTriesExceededException as max_tries_exception
+                    except ImportError:
+                        max_tries_exception = Exception
+                        logging.warning("Could not import specific MaxTriesExceededException from scholarly. Rate limit errors might not be caught precisely.")
+                MaxTriesExceededException = max_tries_exception
+                scholarly_api = scholarly.scholarly
+    return scholarly_api
+
+PDF_AVAILABLE = importlib.util.find_spec('fpdf') is not None
+pdf_class = None
+pdf_import_lock = threading.Lock()
+XPos = YPos = Align = None
+
+def load_pdf_class():
+    global pdf_class, XPos, YPos, Align
+    if pdf_class is None:
+        with pdf_import_lock:
+            if pdf_class is None:
+                from fpdf import FPDF
+                from fpdf.enums import XPos, YPos, Align
+
+                class PDF(PDFReportLayout, FPDF):
+                    pass
+
+                pdf_class = PDF
+    return pdf_class
 
 try:
-    from scholarly._navigator import MaxTriesExceededException
+    from rapidfuzz import fuzz, process as rapidfuzz_process
+
+    def name_similarities(query, names, score_cutoff=0.0):
+        ratios = [0.0] * len(names)
+        for _, score, index in rapidfuzz_process.extract(query, names, scorer=fuzz.ratio, processor=None, limit=None, score_cutoff=score_cutoff * 100):
+            ratios[index] = score / 100.0
+        return ratios
 except ImportError:
-    try:
-        from scholarly._proxy_generator import MaxTriesExceededException
-    except ImportError:
-        MaxTriesExceededException = Exception
-        logging.warning("Could not import specific MaxTriesExceededException from scholarly. Rate limit errors might not be caught precisely.")
+    from difflib import SequenceMatcher
+
+    def name_similarities(query, names, score_cutoff=0.0):
+        matcher = SequenceMatcher(None, query)
+        ratios = []
+        for name in names:
+            matcher.set_seq2(name)
+            if matcher.real_quick_ratio() < score_cutoff or matcher.quick_ratio() < score_cutoff:
+                ratios.append(0.0)
+            else:
+                ratios.append(matcher.ratio())
+        return ratios
 
 MAX_SEARCH_RESULTS_TO_CHECK = 10
 NAME_SIMILARITY_THRESHOLD = 0.85
 SINGLE_RESULT_SIMILARITY_THRESHOLD = 0.75
 
 MAX_PUBS_TO_PROCESS = 100
+MAX_FETCH_WORKERS = 6
+MIN_REQUEST_INTERVAL_SECONDS = 1.0
+RATE_LIMIT_INTERVAL_MAX_FACTOR = 8
+RATE_LIMIT_RETRY_DELAY_SECONDS = 30
+RATE_LIMIT_MAX_RETRIES = 3
+RATE_LIMIT_MAX_DELAY_SECONDS = 300
 TOP_N_PUBS_TO_SAVE_IN_REPORT = 100
+IGNORE_PDF_ERRORS = False
 OUTPUT_DIR = "L-index calculations"
+RUN_DAY = datetime.date.today()
+RUN_DATE = RUN_DAY.isoformat()
+
+USE_CACHE = True
+FORCE_RESCRAPE = False
+CACHE_REPLAY_ONLY = False
+CACHE_TTL_DAYS = 7
+PUB_CACHE_TTL_DAYS = 30
+NOT_FOUND_CACHE_TTL_DAYS = 1
+CACHE_FILE = os.path.join(OUTPUT_DIR, ".scholar_cache.sqlite3")
 
 logger = logging.getLogger()
 
+SCHOLAR_AUTHOR_SEARCH_PAGE_SIZE = 10
+
+PubRecord = namedtuple('PubRecord', 'term title year citations authors age')
+
 LARGE_GROUP_KEYWORDS = ["consortium", "consortia", "group", "collaboration", "society", "association", "initiative", "network", "committee", "investigators", "program", "programm", "team", "atlas", "international"]
+AUTHOR_SPLIT_RE = re.compile(r'\s+and\s+|[;,]', re.IGNORECASE)
+ET_AL_RE = re.compile(r'\bet\s+al\b', re.IGNORECASE)
+LARGE_GROUP_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, LARGE_GROUP_KEYWORDS)) + r')\b', re.IGNORECASE)
+SCHOLAR_ID_RE = re.compile(r'^[\w-]{12}$')
+FILENAME_UNSAFE_RE = re.compile(r'(?:[^\w\-.]|_)+')
+META_WHITESPACE_TRANSLATION = str.maketrans({'\xa0': ' ', '\u2007': ' ', '\u2009': ' ', '\u202f': ' '})
+PDF_LATIN1_TRANSLATION = str.maketrans({
+    '\u2010': '-', '\u2011': '-', '\u2012': '-', '\u2013': '-', '\u2014': '-', '\u2212': '-',
+    '\u2018': "'", '\u2019': "'", '\u201a': "'", '\u201c': '"', '\u201d': '"', '\u201e': '"',
+    '\u2026': '...', '\u2009': ' ', '\u200b': '',
+})
 
 log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
 if logger.hasHandlers():
@@ -44,67 +143,195 @@ logger.addHandler(stream_handler)
 logging.getLogger('fontTools').setLevel(logging.WARNING)
 
 def sanitize_filename(name):
-    s = re.sub(r'[^\w\-\.]+', '_', name)
-    s = re.sub(r'_+', '_', s).strip('_')
+    s = FILENAME_UNSAFE_RE.sub('_', name).strip('_')
+    s = s.encode('utf-8')[:150].decode('utf-8', 'ignore').rstrip('_')
     return s if s else "invalid_name"
 
+@lru_cache(maxsize=1024)
 def count_authors(author_string):
     if not author_string:
         return None
     if isinstance(author_string, (list, tuple)):
-        author_string = ' and '.join(map(str, author_string))
-        if not author_string:
-            return None
-
-    author_string_lower = author_string.lower()
-    author_string_padded = f' {author_string_lower} '
-
-    temp_string = author_string_lower.replace(' and ', ',').replace(';', ',')
-    parts = [part.strip() for part in temp_string.split(',') if part.strip()]
-    base_count = max(1, len(parts))
+        author_names = [str(name) for name in author_string]
+        base_count = max(1, sum(1 for name in author_names if name.strip()))
+        author_string = ', '.join(author_names)
+    else:
+        parts = [part for part in AUTHOR_SPLIT_RE.split(author_string) if part.strip()]
+        base_count = max(1, len(parts))
 
     additional_count = 0
-    if ' et al' in author_string_padded: additional_count += 3
-    found_large_group = False
-    for keyword in LARGE_GROUP_KEYWORDS:
-        if f' {keyword} ' in author_string_padded:
-            found_large_group = True; break
-    if found_large_group: additional_count += 50
+    if ET_AL_RE.search(author_string): additional_count += 3
+    if LARGE_GROUP_RE.search(author_string): additional_count += 50
     return base_count + additional_count
 
-def encode_string_for_pdf(text):
+request_pacer_lock = threading.Lock()
+next_request_time = 0.0
+request_interval_factor = 1.0
+last_interval_increase_time = 0.0
+rate_limit_block_active = False
+rate_limit_retry_successes = 0
+
+def pause_requests(seconds):
+    global next_request_time
+    with request_pacer_lock:
+        next_request_time = max(next_request_time, time.monotonic() + seconds)
+
+def wait_for_request_slot():
+    global next_request_time
+    with request_pacer_lock:
+        now = time.monotonic()
+        wait_seconds = next_request_time - now
+        next_request_time = max(now, next_request_time) + MIN_REQUEST_INTERVAL_SECONDS * request_interval_factor
+    if wait_seconds > 0:
+        time.sleep(wait_seconds)
+
+def scholar_request(func, *args, **kwargs):
+    global rate_limit_retry_successes, request_interval_factor, last_interval_increase_time, rate_limit_block_active
+    attempt = 0
+    while True:
+        wait_for_request_slot()
+        request_started = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+            if attempt or request_interval_factor > 1.0 or rate_limit_block_active:
+                with request_pacer_lock:
+                    request_interval_factor = max(1.0, request_interval_factor * 0.9)
+                    if request_started > last_interval_increase_time:
+                        rate_limit_block_active = False
+                    if attempt:
+                        rate_limit_retry_successes += 1
+            return result
+        except MaxTriesExceededException as rt_err:
+            with request_pacer_lock:
+                slowed_down = not rate_limit_block_active
+                if slowed_down:
+                    request_interval_factor = min(RATE_LIMIT_INTERVAL_MAX_FACTOR, request_interval_factor * 2)
+                    last_interval_increase_time = time.monotonic()
+                    rate_limit_block_active = True
+                interval_after_limit = MIN_REQUEST_INTERVAL_SECONDS * request_interval_factor
+            if slowed_down:
+                logger.info("Spacing Google Scholar requests %.1f seconds apart after rate limit.", interval_after_limit)
+            if MaxTriesExceededException is Exception or attempt >= RATE_LIMIT_MAX_RETRIES:
+                raise
+            delay = min(RATE_LIMIT_MAX_DELAY_SECONDS, RATE_LIMIT_RETRY_DELAY_SECONDS * 2 ** attempt) + random.uniform(0, 1)
+            attempt += 1
+            logger.warning("Rate limit hit (%s). Pausing requests for %.1f seconds before retry %d/%d.", rt_err, delay, attempt, RATE_LIMIT_MAX_RETRIES)
+            pause_requests(delay)
+
+cache_lock = threading.Lock()
+cache_connection = None
+cache_hit_count = 0
+
+def get_cache_connection():
+    global cache_connection
+    if cache_connection is None:
+        os.makedirs(os.path.dirname(CACHE_FILE) or '.', exist_ok=True)
+        cache_connection = sqlite3.connect(CACHE_FILE, check_same_thread=False)
+        cache_connection.execute("CREATE TABLE IF NOT EXISTS scholar_cache (key TEXT PRIMARY KEY, ts REAL, data BLOB)")
+        cache_connection.commit()
+    return cache_connection
+
+def cache_get(key, ttl_days=None):
+    global cache_hit_count
+    if not USE_CACHE or FORCE_RESCRAPE:
+        return None
+    if ttl_days is None:
+        ttl_days = CACHE_TTL_DAYS
+    try:
+        with cache_lock:
+            row = get_cache_connection().execute("SELECT ts, data FROM scholar_cache WHERE key = ?", (key,)).fetchone()
+        if row is None or (not CACHE_REPLAY_ONLY and time.time() - row[0] > ttl_days * 86400):
+            return None
+        value = pickle.loads(row[1])
+        with cache_lock:
+            cache_hit_count += 1
+        return value
+    except Exception as e:
+        logger.warning("Could not read '%s' from cache: %s", key, e)
+        return None
+
+def cache_put(key, value):
+    if not USE_CACHE:
+        return
+    try:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with cache_lock:
+            connection = get_cache_connection()
+            connection.execute("INSERT OR REPLACE INTO scholar_cache (key, ts, data) VALUES (?, ?, ?)", (key, time.time(), data))
+            connection.commit()
+    except Exception as e:
+        logger.warning("Could not write '%s' to cache: %s", key, e)
+
+def cached_scholar_call(cache_key, method_name, *args, cache_ttl_days=None, **kwargs):
+    value = cache_get(cache_key, cache_ttl_days)
+    if value is not None:
+        return value, True
+    if CACHE_REPLAY_ONLY:
+        raise CacheMissError(f"'{cache_key}' is not in the cache and network requests are disabled in cache replay mode.")
+    value = scholar_request(getattr(load_scholarly(), method_name), *args, **kwargs)
+    if value:
+        cache_put(cache_key, value)
+    return value, False
+
+def pub_cache_key(pub_stub):
+    pub_id = pub_stub.get('author_pub_id')
+    if not pub_id:
+        title = pub_stub.get('bib', {}).get('title', '')
+        pub_id = hashlib.sha1(title.encode('utf-8')).hexdigest()
+    return f"pub:{pub_id}:v1"
+
+def encode_string_for_pdf(text, latin1_only=False):
     if text is None:
         return ""
-    return str(text)
+    text_str = text if isinstance(text, str) else str(text)
+    if not latin1_only:
+        return text_str
+    try:
+        text_str.encode('latin-1')
+        return text_str
+    except UnicodeEncodeError:
+        pass
+    translated = text_str.translate(PDF_LATIN1_TRANSLATION)
+    try:
+        translated.encode('latin-1')
+        return translated
+    except UnicodeEncodeError:
+        return translated.encode('latin-1', 'replace').decode('latin-1')
 
 
-class PDF(FPDF):
+class PDFReportLayout:
+    font_family_name = 'DejaVu'
+
     def header(self):
         pass
 
+    def normalize_text(self, text):
+        if not self.is_ttf_font:
+            text = encode_string_for_pdf(text, latin1_only=True)
+        return super().normalize_text(text)
+
     def chapter_title(self, title):
-        self.set_font('DejaVu', 'B', 12)
+        self.set_font(self.font_family_name, 'B', 12)
         safe_title = encode_string_for_pdf(title)
         self.cell(0, 8, safe_title, border=0, align='L', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         self.ln(2)
 
     def chapter_body(self, data, is_list=False):
-        self.set_font('DejaVu', '', 10)
+        self.set_font(self.font_family_name, '', 10)
         if is_list:
             for item in data:
-                safe_item = encode_string_for_pdf(f"- {item}")
-                self.multi_cell(0, 5, safe_item, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+                self.multi_cell(0, 5, f"- {encode_string_for_pdf(item)}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         else:
             safe_data = encode_string_for_pdf(data)
             self.multi_cell(0, 5, safe_data, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         self.ln()
 
     def key_value(self, key, value, is_link=False, link_url=""):
-        self.set_font('DejaVu', 'B', 10)
+        self.set_font(self.font_family_name, 'B', 10)
         key_width = 30
         safe_key = encode_string_for_pdf(key + ":")
         self.cell(key_width, 6, safe_key, border=0, align='L', new_x=XPos.RIGHT, new_y=YPos.TOP)
-        self.set_font('DejaVu', '', 10)
+        self.set_font(self.font_family_name, '', 10)
         current_x = self.get_x()
         if value:
             processed_value = encode_string_for_pdf(value)
@@ -122,9 +349,20 @@ class PDF(FPDF):
              self.set_x(current_x)
              self.cell(0, 6, "N/A", border=0, align='L', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
+    def table_header(self, header, col_widths):
+        self.set_font(self.font_family_name, 'B', 8)
+        last_idx = len(header) - 1
+        for i, title in enumerate(header):
+            new_x_pos = XPos.RIGHT if i < last_idx else XPos.LMARGIN
+            new_y_pos = YPos.TOP if i < last_idx else YPos.NEXT
+            self.cell(col_widths[i], 7, title, border=1, align=Align.C, new_x=new_x_pos, new_y=new_y_pos)
+        self.set_font(self.font_family_name, '', 8)
+
     def publication_table(self, header, data):
-        self.set_font('DejaVu', 'B', 8)
-        total_width = self.w - 2 * self.l_margin
+        l_margin = self.l_margin
+        right_edge = self.w - self.r_margin
+        page_bottom = self.h - self.b_margin
+        total_width = self.w - 2 * l_margin
         base_pcts = [0.04, 0.08, 0.08, 0.08, 0.05, 0.06]
         min_widths = [8, 12, 12, 12, 8, 10]
         col_widths = [max(min_w, total_width * pct) for min_w, pct in zip(min_widths, base_pcts)]
@@ -135,46 +373,29 @@ class PDF(FPDF):
             scale_factor = total_width / current_total
             col_widths = [w * scale_factor for w in col_widths]
 
-        for i, title in enumerate(header):
-            align_val = Align.C
-            new_x_pos = XPos.RIGHT if i < len(header) - 1 else XPos.LMARGIN
-            new_y_pos = YPos.TOP if i < len(header) - 1 else YPos.NEXT
-            header_text = encode_string_for_pdf(title)
-            self.cell(col_widths[i], 7, header_text, border=1, align=align_val, new_x=new_x_pos, new_y=new_y_pos)
-
-        self.set_font('DejaVu', '', 8)
+        self.table_header(header, col_widths)
         line_height_for_cells = 5
         align_map = [Align.R, Align.R, Align.R, Align.R, Align.R, Align.C, Align.L]
-
-        _avg_char_width_mm_cached = getattr(self, '_avg_char_width_mm_cached', None)
-        if _avg_char_width_mm_cached is None:
-            sample_str_for_avg_width = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 "
-            _avg_char_width_mm_cached = 0
-            if self.font_size > 0:
-                try:
-                    width_of_sample = self.get_string_width(sample_str_for_avg_width)
-                    if width_of_sample > 0:
-                        _avg_char_width_mm_cached = width_of_sample / len(sample_str_for_avg_width)
-                except Exception: pass
-
-            if _avg_char_width_mm_cached == 0: 
-                _avg_char_width_mm_cached = self.font_size * 0.45
-            if _avg_char_width_mm_cached == 0: 
-                _avg_char_width_mm_cached = 1.0
-            self._avg_char_width_mm_cached = _avg_char_width_mm_cached
+        usable_widths = [w - 2 * self.c_margin for w in col_widths]
+        border_xs = [l_margin]
+        for individual_col_width in col_widths:
+            border_xs.append(border_xs[-1] + individual_col_width)
 
         for row_idx, row_data in enumerate(data):
             y_start_row = self.get_y()
             max_lines_this_row = 1
             needed_row_height = 0
+            row_cell_lines = [None] * len(row_data)
 
             try:
-                for cell_idx, cell_content_text in enumerate(row_data):
-                    text_for_cell = encode_string_for_pdf(cell_content_text)
+                for cell_idx, text_for_cell in enumerate(row_data):
                     width_for_cell = col_widths[cell_idx]
                     
                     num_cell_lines = 1
-                    if width_for_cell > 0:
+                    if width_for_cell > 0 and '\n' not in text_for_cell and self.get_string_width(text_for_cell) < usable_widths[cell_idx]:
+                        num_cell_lines = 1
+                        row_cell_lines[cell_idx] = (text_for_cell,)
+                    elif width_for_cell > 0:
                         prev_x, prev_y = self.get_x(), self.get_y()
                         lines_list = self.multi_cell(
                             w=width_for_cell, h=line_height_for_cells, text=text_for_cell,
@@ -182,6 +403,7 @@ class PDF(FPDF):
                         )
                         self.set_xy(prev_x, prev_y)
                         num_cell_lines = max(1, len(lines_list))
+                        row_cell_lines[cell_idx] = lines_list
                     else:
                         num_cell_lines = max(1, text_for_cell.count('\n') + 1)
                     max_lines_this_row = max(max_lines_this_row, num_cell_lines)
@@ -190,19 +412,17 @@ class PDF(FPDF):
 
             except (TypeError, AttributeError) as e:
                 err_msg = str(e).lower()
-                if 'split_only' in err_msg or "unexpected keyword argument 'split_only'" in err_msg:
+                if 'dry_run' in err_msg or 'split_only' in err_msg:
                     if not getattr(self, '_split_only_fallback_warned', False):
-                        logger.warning("FPDF version might not support multi_cell(split_only=True). Using fallback height estimation for all cells. Table layout may be suboptimal.")
+                        logger.warning("FPDF version might not support multi_cell(dry_run=True). Using fallback height estimation for all cells. Table layout may be suboptimal.")
                         self._split_only_fallback_warned = True
                     
                     max_estimated_lines_this_row = 1
-                    for cell_idx_fallback, cell_content_text_fallback in enumerate(row_data):
-                        text_fb = encode_string_for_pdf(cell_content_text_fallback)
-                        width_fb = col_widths[cell_idx_fallback]
+                    for cell_idx_fallback, text_fb in enumerate(row_data):
                         num_cell_lines_fb = 1
-                        if width_fb > 0 and self._avg_char_width_mm_cached > 0 and len(text_fb) > 0:
-                            chars_that_fit_line_fb = max(1, math.floor(width_fb / self._avg_char_width_mm_cached))
-                            num_cell_lines_fb = math.ceil(len(text_fb) / chars_that_fit_line_fb)
+                        usable_width_fb = usable_widths[cell_idx_fallback]
+                        if usable_width_fb > 0 and len(text_fb) > 0:
+                            num_cell_lines_fb = math.ceil(self.get_string_width(text_fb) / usable_width_fb)
                         
                         num_cell_lines_fb = max(1, num_cell_lines_fb)
                         num_cell_lines_fb = max(num_cell_lines_fb, text_fb.count('\n') + 1)
@@ -212,61 +432,57 @@ class PDF(FPDF):
                 else:
                     raise e
             
-            if y_start_row + needed_row_height > self.h - self.b_margin:
+            if y_start_row + needed_row_height > page_bottom:
                 self.add_page()
-                self.set_font('DejaVu', 'B', 8)
-                for i_h, title_h in enumerate(header):
-                    align_val = Align.C
-                    new_x_pos = XPos.RIGHT if i_h < len(header) - 1 else XPos.LMARGIN
-                    new_y_pos = YPos.TOP if i_h < len(header) - 1 else YPos.NEXT
-                    header_text_new = encode_string_for_pdf(title_h)
-                    self.cell(col_widths[i_h], 7, header_text_new, border=1, align=align_val, new_x=new_x_pos, new_y=new_y_pos)
-                self.set_font('DejaVu', '', 8)
+                self.table_header(header, col_widths)
                 y_start_row = self.get_y()
 
             actual_row_end_y = y_start_row + needed_row_height
-            current_x_for_cell = self.l_margin
-
-            for idx, (cell_item_data, cell_w, cell_align) in enumerate(zip(row_data, col_widths, align_map)):
-                self.set_xy(current_x_for_cell, y_start_row)
-                processed_text = encode_string_for_pdf(cell_item_data)
-                self.multi_cell(w=cell_w, h=line_height_for_cells, text=processed_text, 
-                                border=0, align=cell_align, 
-                                new_x=XPos.RIGHT, new_y=YPos.TOP)
-                current_x_for_cell += cell_w
+
+            for processed_text, cell_lines, cell_x, cell_w, cell_align in zip(row_data, row_cell_lines, border_xs, col_widths, align_map):
+                if cell_lines is None:
+                    self.set_xy(cell_x, y_start_row)
+                    self.multi_cell(w=cell_w, h=line_height_for_cells, text=processed_text, 
+                                    border=0, align=cell_align, 
+                                    new_x=XPos.RIGHT, new_y=YPos.TOP)
+                    continue
+                line_y = y_start_row
+                for cell_line in cell_lines:
+                    self.set_xy(cell_x, line_y)
+                    self.cell(cell_w, line_height_for_cells, cell_line, border=0, align=cell_align)
+                    line_y += line_height_for_cells
             
-            temp_x_for_border = self.l_margin
-            self.line(temp_x_for_border, y_start_row, temp_x_for_border, actual_row_end_y)
-            for individual_col_width in col_widths:
-                temp_x_for_border += individual_col_width
-                self.line(temp_x_for_border, y_start_row, temp_x_for_border, actual_row_end_y)
+            for border_x in border_xs:
+                self.line(border_x, y_start_row, border_x, actual_row_end_y)
             
-            self.line(self.l_margin, actual_row_end_y, self.w - self.r_margin, actual_row_end_y)
+            self.line(l_margin, actual_row_end_y, right_edge, actual_row_end_y)
             
             self.set_y(actual_row_end_y)
 
 
-def save_results_to_pdf(filename, author_details, l_index, processed_count, total_pubs_reported, top_pubs, was_rate_limited, skips_summary_data):
+def save_results_to_pdf(filename, author_details, l_index, processed_count, total_pubs_reported, top_pubs, was_rate_limited, skips_summary_data, rate_limit_retries_succeeded=0):
+    start_time = time.perf_counter()
     try:
-        pdf = PDF(orientation='L', unit='mm', format='A4')
+        pdf = load_pdf_class()(orientation='L', unit='mm', format='A4')
+        pdf.set_compression(True)
 
         try:
             pdf.add_font('DejaVu', '', 'DejaVuSans.ttf')
             pdf.add_font('DejaVu', 'B', 'DejaVuSans-Bold.ttf')
             pdf.add_font('DejaVu', 'I', 'DejaVuSans-Oblique.ttf')
-            pdf.add_font('DejaVu', 'BI', 'DejaVuSans-BoldOblique.ttf')
-        except RuntimeError as e:
-            logger.error(f"Could not load DejaVu font: {e}. Cyrillic characters may not display correctly.")
-            logger.error("Please ensure DejaVuSans.ttf, DejaVuSans-Bold.ttf, DejaVuSans-Oblique.ttf, and DejaVuSans-BoldOblique.ttf are in the script's directory or provide a full path.")
+        except (RuntimeError, OSError) as e:
+            pdf.font_family_name = 'Helvetica'
+            logger.error("Could not load DejaVu font: %s. Cyrillic characters may not display correctly.", e)
+            logger.error("Please ensure DejaVuSans.ttf, DejaVuSans-Bold.ttf and DejaVuSans-Oblique.ttf are in the script's directory or provide a full path.")
             logger.error("Falling back to Helvetica; Cyrillic support will be MISSING.")
 
         pdf.add_page()
 
         author_name = author_details.get('name', 'N/A')
-        pdf.set_font('DejaVu', 'B', 14)
+        pdf.set_font(pdf.font_family_name, 'B', 14)
         pdf.multi_cell(0, 10, encode_string_for_pdf(author_name), border=0, align='L', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
-        pdf.set_font('DejaVu', '', 10)
+        pdf.set_font(pdf.font_family_name, '', 10)
         affiliation = author_details.get('affiliation')
         if affiliation:
             pdf.multi_cell(0, 5, encode_string_for_pdf(affiliation), align='L', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
@@ -290,30 +506,27 @@ def save_results_to_pdf(filename, author_details, l_index, processed_count, tota
         pdf.ln(5)
 
         if was_rate_limited:
-            pdf.set_text_color(255, 0, 0); pdf.set_font('DejaVu', 'B', 10)
+            pdf.set_text_color(255, 0, 0); pdf.set_font(pdf.font_family_name, 'B', 10)
             pdf.multi_cell(0, 5, encode_string_for_pdf("*** WARNING: Processing aborted or affected by Google Scholar rate limit (429 errors). Results may be based on incomplete data. ***"), border=0, align='L', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
             pdf.set_text_color(0, 0, 0); pdf.ln(2)
 
         pdf.key_value("L-index", f"{l_index:.2f}" if l_index is not None else "Error")
 
-        pdf.set_font('DejaVu', 'I', 9)
-        current_date_str = datetime.datetime.now().strftime("%d %B %Y")
+        pdf.set_font(pdf.font_family_name, 'I', 9)
+        current_date_str = RUN_DAY.strftime("%d %B %Y")
         calc_basis_str = f"Calculated on {current_date_str} based on the {total_pubs_reported} most cited publications fetched"
         pdf.multi_cell(0, 5, encode_string_for_pdf(calc_basis_str), align='L', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-        pdf.set_font('DejaVu', '', 10)
+        pdf.set_font(pdf.font_family_name, '', 10)
         pdf.ln(1)
 
         pdf.ln(3)
-        total_skipped_in_pdf = sum(
-            count for reason, count in skips_summary_data.items()
-            if reason != 'processing_halted_by_rate_limit' and count > 0
-        )
-        halted_early_count_pdf = skips_summary_data.get('processing_halted_by_rate_limit', 0)
-
-        if total_skipped_in_pdf > 0 or halted_early_count_pdf > 0:
-            pdf.set_font('DejaVu', 'B', 10)
+        halted_early_count_pdf = skips_summary_data['processing_halted_by_rate_limit']
+        total_skipped_in_pdf = sum(skips_summary_data.values()) - halted_early_count_pdf
+
+        if total_skipped_in_pdf > 0 or halted_early_count_pdf > 0 or rate_limit_retries_succeeded > 0:
+            pdf.set_font(pdf.font_family_name, 'B', 10)
             pdf.cell(0, 6, "Publication Processing Notes:", border=0, align='L', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-            pdf.set_font('DejaVu', '', 9)
+            pdf.set_font(pdf.font_family_name, '', 9)
 
             if total_skipped_in_pdf > 0:
                 pdf.multi_cell(0, 5, encode_string_for_pdf(f"- Publications skipped due to missing/invalid data: {total_skipped_in_pdf}"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
@@ -324,6 +537,8 @@ def save_results_to_pdf(filename, author_details, l_index, processed_count, tota
             
             if halted_early_count_pdf > 0:
                 pdf.multi_cell(0, 5, encode_string_for_pdf(f"- Publications not processed/completed due to rate limit or early stop: {halted_early_count_pdf}"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+            if rate_limit_retries_succeeded > 0:
+                pdf.multi_cell(0, 5, encode_string_for_pdf(f"- Requests completed after waiting out a rate limit: {rate_limit_retries_succeeded}"), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
             pdf.ln(3)
 
         pdf.ln(5)
@@ -339,26 +554,26 @@ def save_results_to_pdf(filename, author_details, l_index, processed_count, tota
             table_data = []
             for i, pub_data in enumerate(pubs_to_show_in_table):
                 rank_str = f"{i+1}."
-                term_str = f"{pub_data['term']:.1f}"
-                c_str = str(pub_data['citations'])
-                a_str = str(pub_data['authors'])
-                y_str = str(pub_data['age'])
-                yr_str = str(pub_data['year'])
-                title_str = str(pub_data['title'])[:150] + ('...' if len(str(pub_data['title'])) > 150 else '')
-                table_data.append([rank_str, term_str, c_str, a_str, y_str, yr_str, title_str])
-            pdf.publication_table(header, table_data)
+                term_str = f"{pub_data.term:.1f}"
+                c_str = str(pub_data.citations)
+                a_str = str(pub_data.authors)
+                y_str = str(pub_data.age)
+                yr_str = str(pub_data.year)
+                full_title = str(pub_data.title)
+                title_str = full_title[:150] + ('...' if len(full_title) > 150 else '')
+                table_data.append([encode_string_for_pdf(cell) for cell in (rank_str, term_str, c_str, a_str, y_str, yr_str, title_str)])
+            pdf.publication_table([encode_string_for_pdf(title) for title in header], table_data)
 
         pdf.ln(10)
-        pdf.set_font('DejaVu','', 8)
-        current_year = datetime.datetime.now().year
+        pdf.set_font(pdf.font_family_name, '', 8)
         footer1 = f"L-index Calculator by Aleksey V. Belikov, 2025"
         footer2 = f"L-index concept by Aleksey V. Belikov & Vitaly V. Belikov, 2015"
         pdf.cell(0, 5, encode_string_for_pdf(footer1), align='L', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         pdf.cell(0, 5, encode_string_for_pdf(footer2), align='L', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
 
-        pdf.set_font('DejaVu', 'B', 8)
+        pdf.set_font(pdf.font_family_name, 'B', 8)
         pdf.cell(0, 5, " ", align='L', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
-        pdf.set_font('DejaVu','', 8)
+        pdf.set_font(pdf.font_family_name, '', 8)
         citation_text = "Belikov AV and Belikov VV. A citation-based, author- and age-normalized, logarithmic index for evaluation of individual researchers independently of publication counts. F1000Research 2015, 4:884"
         citation_url = "https://doi.org/10.12688/f1000research.7070.2"
         pdf.multi_cell(0, 4, encode_string_for_pdf(citation_text), align='L', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
@@ -366,98 +581,212 @@ def save_results_to_pdf(filename, author_details, l_index, processed_count, tota
         pdf.cell(0, 4, encode_string_for_pdf(f"({citation_url})"), align='L', link=citation_url, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         pdf.set_text_color(0, 0, 0); pdf.set_font('', '')
 
-        pdf.output(filename)
-        logger.info(f"Results successfully saved to PDF: {filename}")
+        with open(filename, 'wb') as pdf_file:
+            pdf_file.write(pdf.output())
+        logger.info("Results successfully saved to PDF: %s (built in %.2fs)", filename, time.perf_counter() - start_time)
 
     except Exception as e:
-        logger.error(f"Failed to generate PDF report: {e}", exc_info=True)
-        print(f"\nError: Could not generate PDF report '{filename}'. Check logs.")
+        if not IGNORE_PDF_ERRORS:
+            logger.exception("Failed to generate PDF report after %.2fs: %s", time.perf_counter() - start_time, e)
+            print(f"\nError: Could not generate PDF report '{filename}'. Check logs.")
+
 
+def process_pub(pub_stub, pub_num, num_selected, current_year, rate_limit_event):
+    if rate_limit_event.is_set():
+        return None, 'processing_halted_by_rate_limit'
 
-def calculate_l_index(author_name_or_id, max_pubs_limit):
+    pub_title_guess = pub_stub.get('bib', {}).get('title', 'Unknown Title')
+    logger.info("Processing pub %d/%d: '%.60s...'", pub_num, num_selected, pub_title_guess)
+
+    try:
+        pub = None
+        bib = {}
+        author_str = ''
+        citations = 0
+
+        try:
+            pub, from_cache = cached_scholar_call(pub_cache_key(pub_stub), 'fill', pub_stub, cache_ttl_days=PUB_CACHE_TTL_DAYS)
+            if from_cache:
+                logger.info("Using cached details for pub %d.", pub_num)
+            bib = pub.get('bib', {})
+        except MaxTriesExceededException as rt_err:
+            if not rate_limit_event.is_set():
+                logger.error("Rate limit hit while filling details for pub %d ('%.50s...'): %s. Aborting further publication processing.", pub_num, pub_title_guess, rt_err)
+            rate_limit_event.set()
+            raise
+        except CacheMissError:
+            raise
+        except Exception as fill_err:
+            logger.warning("Failed to fill details for pub %d ('%.50s...'): %s. Using stub data for checks.", pub_num, pub_title_guess, fill_err, exc_info=False)
+            pub = pub_stub
+            bib = pub.get('bib', {})
+
+        title = bib.get('title', 'Title Not Available')
+        if isinstance(title, str):
+            title = title.translate(META_WHITESPACE_TRANSLATION)
+
+        author_str = bib.get('author', '')
+        if isinstance(author_str, str):
+            author_str = author_str.translate(META_WHITESPACE_TRANSLATION)
+        if not author_str:
+            logger.warning("Skipping pub %d ('%.50s...') due to missing or empty 'author' field.", pub_num, title)
+            return None, 'author_field_empty'
+
+        pub_year_str = bib.get('pub_year', None)
+        if pub_year_str is None:
+            logger.warning("Skipping pub %d ('%.50s...') due to missing 'pub_year' field.", pub_num, title)
+            return None, 'pub_year_missing'
+
+        pub_year = 0
+        try:
+            pub_year = int(pub_year_str)
+            if not (1800 <= pub_year <= current_year + 2):
+                logger.warning("Skipping pub %d ('%.50s...') due to out-of-range year: %d.", pub_num, title, pub_year)
+                return None, 'pub_year_invalid_format_or_range'
+        except ValueError:
+            logger.warning("Skipping pub %d ('%.50s...') due to non-integer year format: '%s'.", pub_num, title, pub_year_str)
+            return None, 'pub_year_invalid_format_or_range'
+
+        citations_val = pub_stub.get('num_citations')
+        if citations_val is None and pub is not pub_stub:
+            citations_val = pub.get('num_citations')
+
+        if citations_val is None:
+            citations = 0
+        else:
+            citations = int(citations_val)
+
+        if isinstance(author_str, list):
+            author_str = tuple(author_str)
+        num_authors_temp = count_authors(author_str)
+        num_authors = 1
+        if num_authors_temp is None:
+            logger.warning("Could not reliably count authors for pub %d ('%.50s...') from non-empty string '%.30s...'. Assuming 1 author.", pub_num, title, author_str)
+        else:
+            num_authors = num_authors_temp
+
+        age = max(1, current_year - pub_year + 1)
+
+        return (title, pub_year, citations, num_authors, age), None
+
+    except (MaxTriesExceededException, CacheMissError):
+        raise
+    except Exception as e:
+        pub_title_for_error = pub_stub.get('bib', {}).get('title', 'Unknown Title')
+        logger.error("Critical error processing pub %d ('%.50s...'): %s. Skipping this publication.", pub_num, pub_title_for_error, e, exc_info=False)
+        return None, 'other_critical_error_per_pub'
+
+
+def calculate_l_index(author_name_or_id, max_pubs_limit, is_id_search=None):
     preliminary_index_I = 0.0
     processed_pubs_count = 0
     author_details = {'name': 'N/A', 'affiliation': None, 'interests': [], 'scholar_id': None, 'citedby': 'N/A'}
-    publication_details = []
     rate_limited = False
     total_pubs_reported = 0
-    i = -1
+    attempted_pubs_count = 0
     
-    skipped_details = {
+    skipped_details = Counter({
         'author_field_empty': 0,
         'pub_year_missing': 0,
         'pub_year_invalid_format_or_range': 0,
         'processing_halted_by_rate_limit': 0,
         'other_critical_error_per_pub': 0
-    }
+    })
 
     try:
-        logger.info(f"Searching for author: {author_name_or_id}")
-        is_id_search = bool(re.match(r'^[\w-]{12}$', author_name_or_id))
+        logger.info("Searching for author: %s", author_name_or_id)
+        if is_id_search is None:
+            is_id_search = len(author_name_or_id) == 12 and bool(SCHOLAR_ID_RE.match(author_name_or_id))
         author_to_process = None
 
         if is_id_search:
             try:
-                author_stub = scholarly.scholarly.search_author_id(author_name_or_id, filled=False)
+                author_stub, _ = cached_scholar_call(f"author_id:{author_name_or_id}:v1", 'search_author_id', author_name_or_id, filled=False)
                 if not author_stub:
                     raise ValueError(f"No author found for ID '{author_name_or_id}'.")
                 author_details['scholar_id'] = author_stub.get('scholar_id')
                 author_details['name'] = author_stub.get('name', 'Name Not Found')
                 author_to_process = author_stub
                 if not author_details['scholar_id']: raise ValueError("Author ID search returned result without scholar_id.")
-                logger.info(f"Found author by ID: {author_details['name']} (ID: {author_details['scholar_id']})")
-            except MaxTriesExceededException as rt_err: logger.error(f"Rate limit during author ID lookup: {rt_err}. Aborting."); rate_limited = True; return None, author_details, 0.0, 0, 0, [], rate_limited, skipped_details
+                logger.info("Found author by ID: %s (ID: %s)", author_details['name'], author_details['scholar_id'])
+            except MaxTriesExceededException as rt_err: logger.error("Rate limit during author ID lookup: %s. Aborting.", rt_err); rate_limited = True; return None, author_details, 0.0, 0, 0, [], rate_limited, skipped_details
             except StopIteration:
-                 logger.error(f"No author found for ID '{author_name_or_id}'. ID might be invalid or profile private/removed.")
+                 logger.error("No author found for ID '%s'. ID might be invalid or profile private/removed.", author_name_or_id)
                  return None, author_details, 0.0, 0, 0, [], rate_limited, skipped_details
-            except Exception as e: logger.error(f"Failed during author ID lookup: {e}", exc_info=False); return None, author_details, 0.0, 0, 0, [], rate_limited, skipped_details
+            except Exception as e: logger.error("Failed during author ID lookup: %s", e, exc_info=False); return None, author_details, 0.0, 0, 0, [], rate_limited, skipped_details
         else:
-             potential_authors = []
-             try:
-                  search_query = scholarly.scholarly.search_author(author_name_or_id)
-                  for idx in range(MAX_SEARCH_RESULTS_TO_CHECK):
-                     try:
-                         auth = next(search_query, None)
-                         if auth is None: break
-                         if auth and 'scholar_id' in auth: potential_authors.append(auth)
-                         elif auth: logger.warning(f"Search result missing 'scholar_id': {auth.get('name', 'N/A')}")
-                     except StopIteration: break
-                     except MaxTriesExceededException as rt_err_inner: logger.error(f"Rate limit during author search iteration {idx+1}: {rt_err_inner}. Stopping search."); rate_limited = True; break
-                     except Exception as e_inner: logger.error(f"Error during author search iteration {idx+1}: {e_inner}. Stopping search."); break
-                  logger.info(f"Found {len(potential_authors)} potential author(s) with IDs.")
-             except MaxTriesExceededException as rt_err: logger.error(f"Rate limit during initial author search setup: {rt_err}. Aborting."); rate_limited = True
-             except StopIteration: logger.info(f"Found {len(potential_authors)} potential author(s) with IDs (StopIteration caught).")
-             except Exception as e: logger.error(f"Error during author search setup: {e}", exc_info=False); potential_authors = []
+             normalized_query = ' '.join(author_name_or_id.lower().split())
+             search_cache_key = f"search:{normalized_query}:v1"
+             not_found_cache_key = f"not_found:{normalized_query}:v1"
+             potential_authors = cache_get(search_cache_key)
+             if potential_authors is not None:
+                 logger.info("Using %d cached search result(s).", len(potential_authors))
+             elif cache_get(not_found_cache_key, NOT_FOUND_CACHE_TTL_DAYS) is not None:
+                 logger.error("Author '%s' was not found on Google Scholar during a recent search (cached). Not searching again.", author_name_or_id)
+                 return None, author_details, 0.0, 0, 0, [], rate_limited, skipped_details
+             elif CACHE_REPLAY_ONLY:
+                 logger.error("No cached search results for '%s' while in cache replay mode.", author_name_or_id)
+                 return None, author_details, 0.0, 0, 0, [], rate_limited, skipped_details
+             else:
+                 potential_authors = []
+                 search_exhausted = False
+                 try:
+                      search_query = load_scholarly().search_author(author_name_or_id)
+                      for idx in range(MAX_SEARCH_RESULTS_TO_CHECK):
+                         try:
+                             if idx % SCHOLAR_AUTHOR_SEARCH_PAGE_SIZE == 0: wait_for_request_slot()
+                             auth = next(search_query, None)
+                             if auth is None: search_exhausted = True; break
+                             if auth and 'scholar_id' in auth: potential_authors.append(auth)
+                             elif auth: logger.warning("Search result missing 'scholar_id': %s", auth.get('name', 'N/A'))
+                         except StopIteration: search_exhausted = True; break
+                         except MaxTriesExceededException as rt_err_inner: logger.error("Rate limit during author search iteration %d: %s. Stopping search.", idx+1, rt_err_inner); rate_limited = True; break
+                         except Exception as e_inner: logger.error("Error during author search iteration %d: %s. Stopping search.", idx+1, e_inner); break
+                      logger.info("Found %d potential author(s) with IDs.", len(potential_authors))
+                      if not potential_authors and search_exhausted:
+                          cache_put(not_found_cache_key, True)
+                 except MaxTriesExceededException as rt_err: logger.error("Rate limit during initial author search setup: %s. Aborting.", rt_err); rate_limited = True
+                 except StopIteration: logger.info("Found %d potential author(s) with IDs (StopIteration caught).", len(potential_authors))
+                 except Exception as e: logger.error("Error during author search setup: %s", e, exc_info=False); potential_authors = []
+
+                 if potential_authors and not rate_limited:
+                     cache_put(search_cache_key, potential_authors)
 
              if rate_limited: return None, author_details, 0.0, 0, 0, [], rate_limited, skipped_details
-             if not potential_authors: logger.error(f"Author '{author_name_or_id}' not found or no suitable matches retrieved."); return None, author_details, 0.0, 0, 0, [], rate_limited, skipped_details
-
-             best_match_author = None; highest_ratio = 0.0; query_lower = author_name_or_id.lower()
-             logger.info("Evaluating potential matches:")
-             for pa in potential_authors:
-                 name_lower = pa.get('name', '').lower();
-                 if not name_lower: continue
-                 ratio = SequenceMatcher(None, query_lower, name_lower).ratio()
-                 logger.info(f"  - Candidate: '{pa.get('name', 'N/A')}', ID: {pa.get('scholar_id', 'N/A')}, Aff: {pa.get('affiliation', 'N/A')}, Ratio: {ratio:.3f}")
-                 if ratio > highest_ratio:
-                     highest_ratio = ratio
-                     best_match_author = pa
-                 elif ratio == highest_ratio and best_match_author:
-                     logger.info(f"  - Note: Equal ratio {ratio:.3f} found for '{pa.get('name', 'N/A')}' and '{best_match_author.get('name', 'N/A')}'. Keeping first best match.")
-                     pass
+             if not potential_authors: logger.error("Author '%s' not found or no suitable matches retrieved.", author_name_or_id); return None, author_details, 0.0, 0, 0, [], rate_limited, skipped_details
 
              selected_author_final = None
              effective_threshold = NAME_SIMILARITY_THRESHOLD
              if len(potential_authors) == 1:
                  effective_threshold = SINGLE_RESULT_SIMILARITY_THRESHOLD
-                 logger.info(f"Only one result found. Using adjusted threshold for selection: {effective_threshold:.2f}")
+                 logger.info("Only one result found. Using adjusted threshold for selection: %.2f", effective_threshold)
+
+             best_match_author = None; highest_ratio = 0.0; query_lower = author_name_or_id.lower()
+             named_candidates = [pa for pa in potential_authors if pa.get('name')]
+             candidate_names = [pa['name'].lower() for pa in named_candidates]
+             candidate_ratios = name_similarities(query_lower, candidate_names, effective_threshold)
+             if candidate_ratios and max(candidate_ratios) > 0:
+                 highest_ratio = max(candidate_ratios)
+                 best_match_author = named_candidates[candidate_ratios.index(highest_ratio)]
+
+             if logger.isEnabledFor(logging.INFO):
+                 logger.info("Evaluating potential matches:")
+                 for pa, ratio in zip(named_candidates, candidate_ratios):
+                     logger.info("  - Candidate: '%s', ID: %s, Aff: %s, Ratio: %s", pa.get('name', 'N/A'), pa.get('scholar_id', 'N/A'), pa.get('affiliation', 'N/A'), f"{ratio:.3f}" if ratio else f"< {effective_threshold:.2f}")
+                     if ratio == highest_ratio and best_match_author and pa is not best_match_author:
+                         logger.info("  - Note: Equal ratio %.3f found for '%s' and '%s'. Keeping first best match.", ratio, pa.get('name', 'N/A'), best_match_author.get('name', 'N/A'))
+
 
              if best_match_author and highest_ratio >= effective_threshold:
                  selected_author_final = best_match_author
-                 logger.info(f"Selected author based on highest ratio >= threshold: {selected_author_final['name']} (Ratio: {highest_ratio:.3f})")
+                 logger.info("Selected author based on highest ratio >= threshold: %s (Ratio: %.3f)", selected_author_final['name'], highest_ratio)
              else:
-                 logger.warning(f"Could not find a confident match. Best match '{best_match_author.get('name', 'N/A') if best_match_author else 'None'}' had ratio {highest_ratio:.3f} (Threshold: {effective_threshold:.2f}).")
-                 logger.error(f"Failed to identify a sufficiently similar author match.")
+                 if best_match_author is None and named_candidates:
+                     candidate_ratios = name_similarities(query_lower, candidate_names)
+                     highest_ratio = max(candidate_ratios)
+                     best_match_author = named_candidates[candidate_ratios.index(highest_ratio)]
+                 logger.warning("Could not find a confident match. Best match '%s' had ratio %.3f (Threshold: %.2f).", best_match_author.get('name', 'N/A') if best_match_author else 'None', highest_ratio, effective_threshold)
+                 logger.error("Failed to identify a sufficiently similar author match.")
                  return None, author_details, 0.0, 0, 0, [], rate_limited, skipped_details
 
              author_to_process = selected_author_final
@@ -468,308 +797,346 @@ def calculate_l_index(author_name_or_id, max_pubs_limit):
             logger.error("Author selection process failed to yield a valid author object or ID.")
             return None, author_details, 0.0, 0, 0, [], rate_limited, skipped_details
 
-        logger.info(f"Fetching full profile details for {author_details.get('name', 'N/A')} (ID: {author_details.get('scholar_id')})...")
-        author_filled_profile = None
+        logger.info("Fetching full profile details and publication list (sorted by citedby, limit %d) for %s (ID: %s)...", max_pubs_limit, author_details.get('name', 'N/A'), author_details.get('scholar_id'))
+        initial_pubs = []
         try:
-            sections_to_fill = ['basics', 'indices', 'interests', 'coauthors', 'counts']
-            author_filled_profile = scholarly.scholarly.fill(author_to_process, sections=sections_to_fill)
+            sections_to_fill = ['basics', 'indices', 'counts', 'publications']
+            author_filled_profile, from_cache = cached_scholar_call(
+                f"author:{author_details['scholar_id']}:{max_pubs_limit}:v1",
+                'fill',
+                author_to_process,
+                sections=sections_to_fill,
+                sortby='citedby',
+                publication_limit=max_pubs_limit
+            )
+            if from_cache:
+                logger.info("Using cached profile details and publication list.")
 
             author_details['name'] = author_filled_profile.get('name', author_details.get('name'))
             author_details['affiliation'] = author_filled_profile.get('affiliation', author_details.get('affiliation'))
             author_details['interests'] = author_filled_profile.get('interests', author_details.get('interests', []))
             author_details['citedby'] = author_filled_profile.get('citedby', author_details.get('citedby', 'N/A'))
 
-            logger.info(f"Successfully fetched profile details. Name: '{author_details['name']}', Affiliation: '{author_details.get('affiliation', 'N/A')}', Total citations reported: {author_details['citedby']}")
+            logger.info("Successfully fetched profile details. Name: '%s', Affiliation: '%s', Total citations reported: %s", author_details['name'], author_details.get('affiliation', 'N/A'), author_details['citedby'])
 
-        except MaxTriesExceededException as rt_err:
-            logger.error(f"Rate limit occurred while fetching full profile details: {rt_err}. Proceeding with potentially incomplete author info (using stub data if available).")
-            rate_limited = True
-        except Exception as e:
-            logger.error(f"Error filling author profile: {e}. Proceeding with potentially incomplete author info.", exc_info=False)
-
-        logger.info(f"Fetching initial publication list (sorted by citedby, limit {max_pubs_limit})...")
-        initial_pubs = []
-        try:
-            author_obj_for_pubs = author_filled_profile if author_filled_profile else author_to_process
-            if 'publications' not in author_obj_for_pubs:
-                logger.info("Filling publications section...")
-                author_pubs_filled = scholarly.scholarly.fill(
-                    author_obj_for_pubs,
-                    sections=['publications'],
-                    sortby='citedby',
-                    publication_limit=max_pubs_limit
-                )
-            else:
-                 logger.info("Publications section already present, using existing data (up to limit).")
-                 author_pubs_filled = author_obj_for_pubs
-
-            if not author_pubs_filled or 'publications' not in author_pubs_filled or author_pubs_filled['publications'] is None:
-                initial_pubs = []
-            else:
-                initial_pubs = author_pubs_filled.get('publications', [])[:max_pubs_limit]
+            if author_filled_profile.get('publications') is not None:
+                initial_pubs = author_filled_profile['publications'][:max_pubs_limit]
 
         except MaxTriesExceededException as rt_err:
-            logger.error(f"Rate limit occurred while fetching publication list: {rt_err}. Aborting calculation.")
+            logger.error("Rate limit occurred while fetching profile details and publication list: %s. Aborting calculation.", rt_err)
             rate_limited = True
             return None, author_details, 0.0, 0, 0, [], rate_limited, skipped_details
         except Exception as e:
-            logger.error(f"Error fetching publication list: {e}", exc_info=False)
+            logger.error("Error fetching profile details and publication list: %s", e, exc_info=False)
             return None, author_details, 0.0, 0, 0, [], rate_limited, skipped_details
 
         total_pubs_reported = len(initial_pubs)
         if not initial_pubs and not rate_limited:
-            logger.warning(f"No publications found for author {author_details.get('name')}. L-index will be 0.")
+            logger.warning("No publications found for author %s. L-index will be 0.", author_details.get('name'))
             return 0.0, author_details, 0.0, 0, total_pubs_reported, [], rate_limited, skipped_details
 
         pubs_to_process = initial_pubs
         num_selected = len(pubs_to_process)
-        logger.info(f"Fetched {num_selected} publications (limit was {max_pubs_limit}). Starting processing...")
-        current_year = datetime.datetime.now().year
-
-        for i, pub_stub in enumerate(pubs_to_process):
-            if rate_limited and not skipped_details['processing_halted_by_rate_limit']:
-                skipped_details['processing_halted_by_rate_limit'] = num_selected - i
-                logger.warning(f"Skipping remaining {num_selected - i} publications processing due to rate limit flag set before or during this pub's processing.")
-                break
-            if skipped_details['processing_halted_by_rate_limit'] > 0:
-                break
-
-            pub_title_guess = pub_stub.get('bib', {}).get('title', 'Unknown Title')
-            logger.info(f"Processing pub {i+1}/{num_selected}: '{pub_title_guess[:60]}...'")
-
-            try:
-                pub = None
-                bib = {}
-                author_str = ''
-                citations = 0
-
+        logger.info("Fetched %d publications (limit was %d). Starting processing...", num_selected, max_pubs_limit)
+        current_year = RUN_DAY.year
+
+        pubs_to_fetch = [(idx, pub_stub) for idx, pub_stub in enumerate(pubs_to_process) if pub_stub.get('num_citations') != 0]
+        uncited_pubs_count = num_selected - len(pubs_to_fetch)
+        if uncited_pubs_count:
+            logger.info("Skipping detail fetch for %d uncited publications; they contribute 0 to the L-index.", uncited_pubs_count)
+
+        processed_pubs_count = uncited_pubs_count
+        attempted_pubs_count = uncited_pubs_count
+        pub_records = [None] * num_selected
+        rate_limit_event = threading.Event()
+        cache_hits_before = cache_hit_count
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_FETCH_WORKERS, len(pubs_to_fetch)))) as executor:
+            future_to_index = {
+                executor.submit(process_pub, pub_stub, idx + 1, num_selected, current_year, rate_limit_event): idx
+                for idx, pub_stub in pubs_to_fetch
+            }
+            for future in as_completed(future_to_index):
+                if future.cancelled():
+                    continue
                 try:
-                    pub = scholarly.scholarly.fill(pub_stub)
-                    bib = pub.get('bib', {})
-                except MaxTriesExceededException as rt_err:
-                    logger.error(f"Rate limit hit while filling details for pub {i+1} ('{pub_title_guess[:50]}...'): {rt_err}. Aborting further publication processing.")
-                    rate_limited = True
-                    skipped_details['processing_halted_by_rate_limit'] = (num_selected - i)
-                    break
-                except Exception as fill_err:
-                    logger.warning(f"Failed to fill details for pub {i+1} ('{pub_title_guess[:50]}...'): {fill_err}. Using stub data for checks.", exc_info=False)
-                    pub = pub_stub
-                    bib = pub.get('bib', {})
-
-                title = bib.get('title', 'Title Not Available')
-
-                author_str = bib.get('author', '')
-                if not author_str:
-                    logger.warning(f"Skipping pub {i+1} ('{title[:50]}...') due to missing or empty 'author' field.")
-                    skipped_details['author_field_empty'] += 1
+                    pub_fields, skip_reason = future.result()
+                except MaxTriesExceededException:
+                    if not rate_limited:
+                        rate_limited = True
+                        for pending_future in future_to_index:
+                            pending_future.cancel()
                     continue
+                except CacheMissError as miss_err:
+                    logger.error("%s Aborting calculation.", miss_err)
+                    for pending_future in future_to_index:
+                        pending_future.cancel()
+                    return None, author_details, 0.0, 0, 0, [], rate_limited, skipped_details
 
-                pub_year_str = bib.get('pub_year', None)
-                if pub_year_str is None:
-                    logger.warning(f"Skipping pub {i+1} ('{title[:50]}...') due to missing 'pub_year' field.")
-                    skipped_details['pub_year_missing'] += 1
+                if skip_reason == 'processing_halted_by_rate_limit':
                     continue
-                
-                pub_year = 0
-                try:
-                    pub_year = int(pub_year_str)
-                    if not (1800 <= pub_year <= current_year + 2):
-                        logger.warning(f"Skipping pub {i+1} ('{title[:50]}...') due to out-of-range year: {pub_year}.")
-                        skipped_details['pub_year_invalid_format_or_range'] += 1
-                        continue
-                except ValueError:
-                    logger.warning(f"Skipping pub {i+1} ('{title[:50]}...') due to non-integer year format: '{pub_year_str}'.")
-                    skipped_details['pub_year_invalid_format_or_range'] += 1
+                attempted_pubs_count += 1
+                if skip_reason:
+                    skipped_details[skip_reason] += 1
                     continue
 
-                citations_val = pub.get('num_citations')
-                if citations_val is None and pub is not pub_stub:
-                    citations_val = pub_stub.get('num_citations')
-
-                if citations_val is None:
-                    citations = 0
-                else:
-                    citations = int(citations_val)
-
-                num_authors_temp = count_authors(author_str)
-                num_authors = 1
-                if num_authors_temp is None:
-                    logger.warning(f"Could not reliably count authors for pub {i+1} ('{title[:50]}...') from non-empty string '{author_str[:30]}...'. Assuming 1 author.")
-                else:
-                    num_authors = num_authors_temp
-                
-                age = max(1, current_year - pub_year + 1)
-                denominator = num_authors * age
-                term = citations / denominator if denominator > 0 else 0
-
-                pub_data = {
-                    'term': term, 'title': title, 'year': pub_year,
-                    'citations': citations, 'authors': num_authors, 'age': age
-                }
-                publication_details.append(pub_data)
-                preliminary_index_I += term
+                idx = future_to_index[future]
+                pub_records[idx] = pub_fields
                 processed_pubs_count += 1
 
                 if (processed_pubs_count % 25 == 0) and processed_pubs_count > 0:
-                    logger.info(f"Processed {processed_pubs_count} valid publications so far...")
+                    logger.info("Processed %d valid publications so far...", processed_pubs_count)
+
+        pub_cache_hits = cache_hit_count - cache_hits_before
+        if pub_cache_hits:
+            logger.info("Loaded details for %d of %d publications from cache.", pub_cache_hits, len(pubs_to_fetch))
+
+        if rate_limited:
+            skipped_details['processing_halted_by_rate_limit'] = num_selected - attempted_pubs_count
+            logger.warning("Skipped remaining %d publications processing due to rate limit.", num_selected - attempted_pubs_count)
 
-            except Exception as e:
-                pub_title_for_error = pub_stub.get('bib', {}).get('title', 'Unknown Title')
-                logger.error(f"Critical error processing pub {i+1} ('{pub_title_for_error[:50]}...'): {e}. Skipping this publication.", exc_info=False)
-                skipped_details['other_critical_error_per_pub'] += 1
+        publication_details = [
+            PubRecord(citations / max(1, num_authors * age), title, year, citations, num_authors, age)
+            for title, year, citations, num_authors, age in filter(None, pub_records)
+        ]
+        terms = [p.term for p in publication_details]
+        preliminary_index_I = math.fsum(terms)
 
         if any(skipped_details.values()):
             logger.info("--- Publication Skipping & Processing Summary ---")
-            total_pubs_iterated_before_stop = i + 1 if i != -1 else 0
-            
-            if pubs_to_process and total_pubs_iterated_before_stop == 0 and skipped_details.get('processing_halted_by_rate_limit',0) == num_selected:
+            if pubs_to_process and attempted_pubs_count == 0 and skipped_details.get('processing_halted_by_rate_limit',0) == num_selected:
                  pass
             elif num_selected > 0 :
-                 logger.info(f"Attempted to process up to publication {total_pubs_iterated_before_stop} out of {num_selected} fetched.")
+                 logger.info("Attempted to process %d out of %d fetched publications.", attempted_pubs_count, num_selected)
 
             for reason, count in skipped_details.items():
                 if count > 0:
                     reason_text = reason.replace('_', ' ')
                     if reason == 'processing_halted_by_rate_limit':
-                        logger.warning(f"{count} publications were not processed or completed due to: {reason_text}")
+                        logger.warning("%d publications were not processed or completed due to: %s", count, reason_text)
                     else:
-                        logger.info(f"Skipped {count} pubs (among those attempted) due to: {reason_text}")
+                        logger.info("Skipped %d pubs (among those attempted) due to: %s", count, reason_text)
 
-        l_index = math.log(preliminary_index_I + 1) if preliminary_index_I > 0 else 0.0
+        l_index = math.log1p(max(preliminary_index_I, 0.0))
 
-        logger.info("Sorting processed publications by contribution score (term)...")
-        sorted_contributors = sorted(publication_details, key=lambda p: p['term'], reverse=True)
+        logger.info("Selecting top processed publications by contribution score (term)...")
+        top_contributing_list = nlargest(TOP_N_PUBS_TO_SAVE_IN_REPORT, publication_details, key=attrgetter('term'))
 
-        positive_term_contributors = [p for p in sorted_contributors if p['term'] > 0]
-        logger.info(f"Identified {len(positive_term_contributors)} processed publications with a contribution score > 0.")
-
-        top_contributing_list = sorted_contributors
+        positive_term_count = sum(1 for t in terms if t > 0)
+        logger.info("Identified %d processed publications with a contribution score > 0.", positive_term_count)
 
         if rate_limited:
             logger.warning("Calculation finished BUT was affected or aborted early due to Google Scholar rate limiting.")
         else:
-            logger.info(f"Calculation process completed. Processed {processed_pubs_count} publications successfully.")
-            if i + 1 < num_selected and not skipped_details.get('processing_halted_by_rate_limit'):
-                 logger.warning(f"Processing loop did not complete all {num_selected} fetched publications (stopped after attempting pub {i+1}). This might indicate an error not caught as rate limit, or all remaining pubs were skipped for data reasons.")
+            logger.info("Calculation process completed. Processed %d publications successfully.", processed_pubs_count)
+            if attempted_pubs_count < num_selected and not skipped_details.get('processing_halted_by_rate_limit'):
+                 logger.warning("Processing did not complete all %d fetched publications (attempted %d). This might indicate an error not caught as rate limit.", num_selected, attempted_pubs_count)
+        logger.debug("Author count cache: %s", count_authors.cache_info())
 
         return l_index, author_details, preliminary_index_I, processed_pubs_count, total_pubs_reported, top_contributing_list, rate_limited, skipped_details
 
     except Exception as e:
-        logger.error(f"An unexpected critical error occurred during the main calculation process: {e}", exc_info=True)
+        logger.error("An unexpected critical error occurred during the main calculation process: %s", e, exc_info=True)
         return None, author_details, preliminary_index_I, processed_pubs_count, total_pubs_reported, [], rate_limited, skipped_details
 
 
-if __name__ == "__main__":
-    print("-" * 60)
-    print("L-index Calculator by Aleksey V. Belikov")
-    print("-" * 60)
-    max_pubs_limit = MAX_PUBS_TO_PROCESS
-    print("-" * 60)
-    print("1. Results are entirely dependent on the accuracy, completeness and public availability of the scientist's Google Scholar profile")
-    print("2. A scientist's Google Scholar ID can be found at the end of their profile URL")
-    print("3. Publications with missing author information or publication year will be skipped and a warning will be issued. Missing citation counts will be treated as 0 citations")
-    print("4. If the script identifies one of the keywords for a large group of authors in the authors database field, it will add 50 authors to the author count, because the actual number of authors is unknown")
-    print(f"5. Keywords used for this are {LARGE_GROUP_KEYWORDS}")
-    print(f"6. Calculation is based on the {max_pubs_limit} of the scientist's most cited publications (or fewer if the scientist has less or some data were missing)")
-    print("7. This can be changed by modifying MAX_PUBS_TO_PROCESS parameter in the code")
-    print("8. Extensive requests can lead to temporary IP blocks (rate limiting) from Google Scholar, so it is recommended to keep MAX_PUBS_TO_PROCESS to 100 or below")
-    print("9. It is recommended to wait (hours, or even a day) if you encounter persistent rate limiting, or try a different IP address or a proxy")
-    print("10. Selecting too low a MAX_PUBS_TO_PROCESS value (e.g. <50) will lead to underestimation of the L-index")
-    print("11. Nevertheless, we demonstrated that 50-100 most cited publications capture the bulk of the L-index, even for scientists with many hundreds of publications")
-    print("12. Always compare scientists using the same MAX_PUBS_TO_PROCESS value to calculate their L-indices")
-    print("-" * 60)
+def process_author(author_query, max_pubs_limit, is_id_search=None):
+    retry_successes_before = rate_limit_retry_successes
+    l_index, author_data, prelim_I, processed_count, total_reported, top_contrib_pubs, was_rate_limited, skips_summary_data = calculate_l_index(
+        author_query,
+        max_pubs_limit,
+        is_id_search
+    )
+
+    rate_limit_retries_succeeded = rate_limit_retry_successes - retry_successes_before
+    if rate_limit_retries_succeeded:
+        logger.info("%d Google Scholar requests succeeded after waiting out a rate limit.", rate_limit_retries_succeeded)
+
+    author_full_name = author_data.get('name')
+    scholar_id = author_data.get('scholar_id')
+    affiliation = author_data.get('affiliation', 'N/A')
+    interests = author_data.get('interests')
+    if author_full_name is None or author_full_name == 'N/A':
+         author_full_name_display = "N/A (Could not be determined)"
+    else:
+         author_full_name_display = author_full_name
+
+    if was_rate_limited:
+        print("\n--- WARNING: RATE LIMITED ---")
+        print(f"Processing may have stopped early or been affected by Google Scholar rate limits.")
+        print("Results shown below might be based on INCOMPLETE data gathered before the limit was hit.")
+        print(f"If errors persist, please wait a significant amount of time (e.g., hours) before trying again.")
+        if author_full_name_display.startswith("N/A"):
+             print("Rate limit may have occurred before the author could be definitively identified.")
+        print("-" * 60)
 
-    author_query = input("Enter the scientist's Google Scholar ID: ")
+    if scholar_id:
+        if l_index is None:
+             print(f"\n--- Calculation Error ---")
+             print(f"Author Identified: {author_full_name_display} (ID: {scholar_id})")
+             print(f"Affiliation:       {affiliation}")
+             print(f"Could not complete L-index calculation due to errors after author identification.")
+             print(f"(Successfully processed {processed_count} publications before error/stop).")
+             print("Please check the script's log output for detailed error messages and skip reasons.")
 
-    if not author_query:
-        print("No author name or ID provided. Exiting.")
-    else:
-        l_index, author_data, prelim_I, processed_count, total_reported, top_contrib_pubs, was_rate_limited, skips_summary_data = calculate_l_index(
-            author_query,
-            max_pubs_limit
-        )
-
-        author_full_name = author_data.get('name')
-        if author_full_name is None or author_full_name == 'N/A':
-             author_full_name_display = "N/A (Could not be determined)"
         else:
-             author_full_name_display = author_full_name
+            pdf_executor = None
+            pdf_future = None
+            if not PDF_AVAILABLE:
+                logger.warning("fpdf2 is not installed; skipping PDF report generation.")
+            elif author_full_name and author_full_name != 'N/A':
+                try:
+                    safe_filename_base = sanitize_filename(f"{author_full_name}_{scholar_id}")
+                    status_tag = "_RATE_LIMITED" if was_rate_limited else ""
+                    pdf_filename = os.path.join(OUTPUT_DIR, f"{safe_filename_base}_L-Index_BasedOn{max_pubs_limit}{status_tag}_{RUN_DATE}.pdf")
+                    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+                    pdf_executor = ThreadPoolExecutor(max_workers=1)
+                    pdf_future = pdf_executor.submit(
+                        save_results_to_pdf,
+                        pdf_filename,
+                        author_data,
+                        l_index,
+                        processed_count,
+                        total_reported,
+                        top_contrib_pubs,
+                        was_rate_limited,
+                        skips_summary_data,
+                        rate_limit_retries_succeeded
+                    )
+                except Exception:
+                    if not IGNORE_PDF_ERRORS:
+                        logger.exception("Could not start PDF report generation.")
+
+            summary_lines = ["\n--- Results Summary ---"]
+            if was_rate_limited: summary_lines.append("(NOTE: Results based on potentially INCOMPLETE data due to rate limiting)")
+            summary_lines += [
+                f"Author Identified: {author_full_name_display}",
+                f"Affiliation:       {affiliation}",
+                f"Interests:         {', '.join(interests) if interests else 'N/A'}",
+                f"Scholar Profile:   https://scholar.google.com/citations?user={scholar_id}",
+                f"L-Index:           {l_index:.2f}",
+                f"Calculation Basis: {total_reported} most cited publications fetched from Google Scholar.",
+                f"Pubs Processed:    {processed_count} / {total_reported} (Fetched)",
+            ]
+
+            halted_by_rate_limit_count = skips_summary_data['processing_halted_by_rate_limit']
+            total_skipped_for_data_reasons = sum(skips_summary_data.values()) - halted_by_rate_limit_count
+
+            if total_skipped_for_data_reasons > 0:
+                summary_lines.append(f"Skipped Publications (due to data issues): {total_skipped_for_data_reasons}")
+                for reason, count in skips_summary_data.items():
+                    if count > 0 and reason not in ['processing_halted_by_rate_limit']:
+                        summary_lines.append(f"      - {count} due to: {reason.replace('_', ' ')}")
+            
+            if halted_by_rate_limit_count > 0:
+                summary_lines.append(f"Processing Halted Early: {halted_by_rate_limit_count} publication(s) were not processed or completed due to rate limiting or other early stop.")
+            if rate_limit_retries_succeeded > 0:
+                summary_lines.append(f"Rate Limit Retries: {rate_limit_retries_succeeded} request(s) completed after waiting out a rate limit.")
+            print("\n".join(summary_lines))
 
-        if was_rate_limited:
-            print("\n--- WARNING: RATE LIMITED ---")
-            print(f"Processing may have stopped early or been affected by Google Scholar rate limits.")
-            print("Results shown below might be based on INCOMPLETE data gathered before the limit was hit.")
-            print(f"If errors persist, please wait a significant amount of time (e.g., hours) before trying again.")
-            if author_full_name_display.startswith("N/A"):
-                 print("Rate limit may have occurred before the author could be definitively identified.")
-            print("-" * 60)
-
-        if author_data.get('scholar_id'):
-            if l_index is None:
-                 print(f"\n--- Calculation Error ---")
-                 print(f"Author Identified: {author_full_name_display} (ID: {author_data.get('scholar_id', 'N/A')})")
-                 print(f"Affiliation:       {author_data.get('affiliation', 'N/A')}")
-                 print(f"Could not complete L-index calculation due to errors after author identification.")
-                 print(f"(Successfully processed {processed_count} publications before error/stop).")
-                 print("Please check the script's log output for detailed error messages and skip reasons.")
 
-            else:
-                print("\n--- Results Summary ---")
-                if was_rate_limited: print("(NOTE: Results based on potentially INCOMPLETE data due to rate limiting)")
-                print(f"Author Identified: {author_full_name_display}")
-                print(f"Affiliation:       {author_data.get('affiliation', 'N/A')}")
-                print(f"Interests:         {', '.join(author_data.get('interests', [])) if author_data.get('interests') else 'N/A'}")
-                scholar_id = author_data.get('scholar_id')
-                print(f"Scholar Profile:   {'https://scholar.google.com/citations?user=' + scholar_id if scholar_id else 'N/A'}")
-                print(f"L-Index:           {l_index:.2f}")
-                print(f"Calculation Basis: {total_reported} most cited publications fetched from Google Scholar.")
-                print(f"Pubs Processed:    {processed_count} / {total_reported} (Fetched)")
-
-                total_skipped_for_data_reasons = sum(
-                    count for reason, count in skips_summary_data.items()
-                    if reason != 'processing_halted_by_rate_limit' and count > 0
-                )
-                halted_by_rate_limit_count = skips_summary_data.get('processing_halted_by_rate_limit', 0)
-
-                if total_skipped_for_data_reasons > 0:
-                    print(f"Skipped Publications (due to data issues): {total_skipped_for_data_reasons}")
-                    for reason, count in skips_summary_data.items():
-                        if count > 0 and reason not in ['processing_halted_by_rate_limit']:
-                            print(f"      - {count} due to: {reason.replace('_', ' ')}")
-                
-                if halted_by_rate_limit_count > 0:
-                    print(f"Processing Halted Early: {halted_by_rate_limit_count} publication(s) were not processed or completed due to rate limiting or other early stop.")
+            if pdf_future is not None:
+                try:
+                    pdf_future.result()
+                except Exception:
+                    if not IGNORE_PDF_ERRORS:
+                        logger.exception("PDF generation thread failed.")
+                finally:
+                    pdf_executor.shutdown()
+            elif PDF_AVAILABLE and not (author_full_name and author_full_name != 'N/A'):
+                logger.warning("Skipping PDF generation because a valid author name could not be determined for the filename.")
+                print("\nWarning: PDF report generation skipped as author name was not fully determined.")
+
+    elif not was_rate_limited:
+         print("\n--- Author Not Found ---")
+         print("Could not calculate L-index.")
+         print("Reason: Author not found or no confident match identified via search.")
+         print("Please check the spelling or try the Google Scholar ID if known.")
 
+    print("-" * 60)
+    return was_rate_limited
 
-                if author_full_name and author_full_name != 'N/A':
-                    try:
-                        safe_filename_base = sanitize_filename(f"{author_full_name}_{author_data.get('scholar_id', 'NoID')}")
-                        status_tag = "_RATE_LIMITED" if was_rate_limited else ""
-                        date_str = datetime.date.today().isoformat()
-                        pdf_filename = os.path.join(OUTPUT_DIR, f"{safe_filename_base}_L-Index_BasedOn{max_pubs_limit}{status_tag}_{date_str}.pdf")
-                        os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-                        save_results_to_pdf(
-                            pdf_filename,
-                            author_data,
-                            l_index,
-                            processed_count,
-                            total_reported,
-                            top_contrib_pubs,
-                            was_rate_limited,
-                            skips_summary_data
-                        )
-                    except Exception as pdf_err:
-                        pass
-                else:
-                    logger.warning("Skipping PDF generation because a valid author name could not be determined for the filename.")
-                    print("\nWarning: PDF report generation skipped as author name was not fully determined.")
 
-        elif not was_rate_limited:
-             print("\n--- Author Not Found ---")
-             print("Could not calculate L-index.")
-             print("Reason: Author not found or no confident match identified via search.")
-             print("Please check the spelling or try the Google Scholar ID if known.")
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
 
-        print("-" * 60)
 
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Calculate the L-index of scientists from their Google Scholar profiles.")
+    query_group = arg_parser.add_mutually_exclusive_group()
+    query_group.add_argument('--author', help="Google Scholar ID or author name to process without prompting")
+    query_group.add_argument('--scholar-id', help="Google Scholar ID to process without prompting; the author name search is skipped")
+    query_group.add_argument('--authors-file', help="text file with one Google Scholar ID or author name per line; all of them are processed without prompting")
+    arg_parser.add_argument('--max-pubs', type=positive_int, default=MAX_PUBS_TO_PROCESS, help=f"number of most cited publications to process (default: {MAX_PUBS_TO_PROCESS})")
+    arg_parser.add_argument('--top-n', type=positive_int, default=TOP_N_PUBS_TO_SAVE_IN_REPORT, help=f"number of top contributing publications listed in the PDF report (default: {TOP_N_PUBS_TO_SAVE_IN_REPORT})")
+    arg_parser.add_argument('--output-dir', default=OUTPUT_DIR, help=f"directory for the PDF reports (default: '{OUTPUT_DIR}')")
+    arg_parser.add_argument('--force-rescrape', action='store_true', default=FORCE_RESCRAPE, help="ignore cached Google Scholar data and fetch everything again")
+    arg_parser.add_argument('--cache-replay', action='store_true', default=CACHE_REPLAY_ONLY, help="only use cached Google Scholar data and never send requests")
+    arg_parser.add_argument('--no-cache', dest='use_cache', action='store_false', default=USE_CACHE, help="neither read nor write the Google Scholar cache")
+    arg_parser.add_argument('--ignore-pdf-errors', action='store_true', default=IGNORE_PDF_ERRORS, help="do not log or print errors from PDF report generation")
+    cli_args = arg_parser.parse_args()
+    if cli_args.cache_replay and (cli_args.force_rescrape or not cli_args.use_cache):
+        arg_parser.error("--cache-replay (CACHE_REPLAY_ONLY) cannot be combined with --force-rescrape (FORCE_RESCRAPE) or --no-cache (USE_CACHE = False)")
+
+    author_queries = []
+    if cli_args.authors_file:
+        try:
+            with open(cli_args.authors_file, encoding='utf-8') as authors_file:
+                author_queries = [line.strip() for line in authors_file if line.strip() and not line.lstrip().startswith('#')]
+        except (OSError, UnicodeDecodeError) as e:
+            arg_parser.error(f"cannot read --authors-file '{cli_args.authors_file}': {getattr(e, 'strerror', None) or e}")
+
+    TOP_N_PUBS_TO_SAVE_IN_REPORT = cli_args.top_n
+    if os.path.dirname(CACHE_FILE) == OUTPUT_DIR:
+        CACHE_FILE = os.path.join(cli_args.output_dir, os.path.basename(CACHE_FILE))
+    OUTPUT_DIR = cli_args.output_dir
+    FORCE_RESCRAPE = cli_args.force_rescrape
+    USE_CACHE = cli_args.use_cache
+    CACHE_REPLAY_ONLY = cli_args.cache_replay
+    IGNORE_PDF_ERRORS = cli_args.ignore_pdf_errors
+
+    max_pubs_limit = cli_args.max_pubs
+    separator = "-" * 60
+    print("\n".join([
+        separator,
+        "L-index Calculator by Aleksey V. Belikov",
+        separator,
+        separator,
+        "1. Results are entirely dependent on the accuracy, completeness and public availability of the scientist's Google Scholar profile",
+        "2. A scientist's Google Scholar ID can be found at the end of their profile URL",
+        "3. Publications with missing author information or publication year will be skipped and a warning will be issued. Missing citation counts will be treated as 0 citations",
+        "4. If the script identifies one of the keywords for a large group of authors in the authors database field, it will add 50 authors to the author count, because the actual number of authors is unknown",
+        f"5. Keywords used for this are {LARGE_GROUP_KEYWORDS}",
+        f"6. Calculation is based on the {max_pubs_limit} of the scientist's most cited publications (or fewer if the scientist has less or some data were missing)",
+        "7. This can be changed by modifying MAX_PUBS_TO_PROCESS parameter in the code or with the --max-pubs option",
+        "8. Extensive requests can lead to temporary IP blocks (rate limiting) from Google Scholar, so it is recommended to keep MAX_PUBS_TO_PROCESS to 100 or below",
+        "9. It is recommended to wait (hours, or even a day) if you encounter persistent rate limiting, or try a different IP address or a proxy",
+        "10. Selecting too low a MAX_PUBS_TO_PROCESS value (e.g. <50) will lead to underestimation of the L-index",
+        "11. Nevertheless, we demonstrated that 50-100 most cited publications capture the bulk of the L-index, even for scientists with many hundreds of publications",
+        "12. Always compare scientists using the same MAX_PUBS_TO_PROCESS value to calculate their L-indices",
+        separator,
+    ]))
+
+    if cli_args.authors_file:
+        if not author_queries:
+            print(f"No author names or IDs found in '{cli_args.authors_file}'. Exiting.")
+        for query_num, author_query in enumerate(author_queries, 1):
+            logger.info("Processing author %d/%d: %s", query_num, len(author_queries), author_query)
+            if process_author(author_query, max_pubs_limit) and query_num < len(author_queries):
+                logger.error("Stopping the batch because Google Scholar is rate limiting requests. %d author(s) were not processed.", len(author_queries) - query_num)
+                print(f"\nBatch stopped after rate limiting: {len(author_queries) - query_num} remaining author(s) not processed. Please wait before running the rest.")
+                break
+    elif cli_args.scholar_id:
+        process_author(cli_args.scholar_id, max_pubs_limit, is_id_search=True)
+    elif cli_args.author:
+        process_author(cli_args.author, max_pubs_limit)
+    else:
+        author_query = input("Enter the scientist's Google Scholar ID: ")
+
+        if not author_query:
+            print("No author name or ID provided. Exiting.")
+        else:
+            process_author(author_query, max_pubs_limit)